@@ -1,140 +1,189 @@
 import streamlit as st
 import requests
-from bs4 import BeautifulSoup
-from langchain.text_splitter import CharacterTextSplitter
-from langchain.embeddings import SentenceTransformerEmbeddings
-from langchain.vectorstores import FAISS
-from langchain.memory import ConversationBufferMemory
-from langchain.chains import ConversationalRetrievalChain
-from langchain.schema import Document
-from langchain_community.llms.ollama import Ollama
+from requests.adapters import HTTPAdapter
+from http.cookiejar import DefaultCookiePolicy
+from selectolax.lexbor import LexborHTMLParser
+import orjson
 import time
 from urllib.parse import urlparse, urljoin
-import pandas as pd
 
-def check_ollama_running():
-    """Check if Ollama is running"""
+# LangChain, FAISS, numpy and torch are imported inside the functions that use
+# them so the page renders before any model tooling is loaded.
+
+_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+_NAME_SELECTOR = 'h1.top-card-layout__title, h1.text-heading-xlarge'
+_HEADLINE_SELECTOR = 'h2.top-card-layout__headline, h2.text-body-medium'
+_ABOUT_SELECTOR = 'section.summary, section.about'
+_ABOUT_FALLBACK_SELECTOR = 'div.core-section-container__content, div.break-words'
+_EXPERIENCE_SELECTOR = 'section.experience, section.experience-section'
+_EDUCATION_SELECTOR = 'section.education, section.education-section'
+_EXP_DURATION_SELECTOR = 'span.date-range, span.experience-item__duration'
+_EDU_DURATION_SELECTOR = 'span.date-range, span.education__item--duration'
+_TITLE_SELECTOR = 'h3, h4'
+_SUBTITLE_SELECTOR = 'h4, h5'
+
+_EXP_ITEM_CLASSES = frozenset({'experience-item', 'experience-list__item'})
+_EDU_ITEM_CLASSES = frozenset({'education__item', 'education-list__item'})
+
+QUICK_QUESTIONS = {
+    "summary": "Can you provide a comprehensive summary of this profile?",
+    "experience": "What is their professional experience background?",
+    "education": "Tell me about their educational background",
+    "skills": "What skills and expertise does this person have?",
+}
+
+@st.cache_resource
+def get_session():
+    """Create one pooled HTTP session per process so reruns reuse keep-alive connections"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    # The session is shared by every user, so never store cookies on it
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+@st.cache_data(ttl=30)
+def fetch_ollama_models():
+    """Fetch the names of the installed Ollama models, cached briefly.
+    Failures raise instead of returning defaults so they are never cached"""
+    response = get_session().get("http://localhost:11434/api/tags", timeout=2)
+    if response.status_code != 200:
+        raise requests.HTTPError(f"Ollama returned status {response.status_code}")
+    models = orjson.loads(response.content).get('models', [])
+    return [model['name'] for model in models]
+
+def get_ollama_status():
+    """Query Ollama once for whether it is running and which models it has"""
     try:
-        response = requests.get("http://localhost:11434/api/tags", timeout=5)
-        if response.status_code == 200:
-            st.sidebar.success("✅ Ollama is running")
-            return True
+        return True, fetch_ollama_models()
     except:
+        return False, ["llama2", "mistral", "gemma"]
+
+def check_ollama_running():
+    """Check if Ollama is running"""
+    running, _ = get_ollama_status()
+    if running:
+        st.sidebar.success("✅ Ollama is running")
+    else:
         st.sidebar.error("❌ Ollama is not running. Please run: `ollama serve`")
-        return False
+    return running
 
 def get_available_models():
     """Get list of available Ollama models"""
-    try:
-        response = requests.get("http://localhost:11434/api/tags", timeout=5)
-        if response.status_code == 200:
-            models = response.json().get('models', [])
-            return [model['name'] for model in models]
-    except:
-        return ["llama2", "mistral", "gemma"]
+    _, models = get_ollama_status()
+    return models
+
+def find_items(section, classes):
+    """List items of a section having any of the given classes, in document order"""
+    return [li for li in section.css('li') if classes.intersection((li.attributes.get('class') or '').split())]
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def fetch_linkedin_profile(profile_url):
+    """Fetch and format a LinkedIn public profile, cached per URL.
+    Failures raise instead of returning a message so they are never cached"""
+    response = get_session().get(profile_url, headers=_HEADERS, timeout=15)
+    
+    if response.status_code != 200:
+        raise requests.HTTPError(f"Failed to access profile. Status: {response.status_code}")
+    
+    tree = LexborHTMLParser(response.content)
+    
+    # Each field is its own css_first lookup. Every lookup walks the tree in C and
+    # stops at its first match, which is cheaper than one Python pass dispatching
+    # over every h1/h2/section/div on the page.
+    
+    # Extract profile information
+    profile_data = {}
+    
+    # Name
+    name_element = tree.css_first(_NAME_SELECTOR) or tree.css_first('h1')
+    profile_data['name'] = name_element.text(strip=True) if name_element else "Not found"
+    
+    # Headline
+    headline_element = tree.css_first(_HEADLINE_SELECTOR) or tree.css_first('h2')
+    profile_data['headline'] = headline_element.text(strip=True) if headline_element else "Not found"
+    
+    # About section
+    about_element = tree.css_first(_ABOUT_SELECTOR) or tree.css_first(_ABOUT_FALLBACK_SELECTOR)
+    profile_data['about'] = about_element.text(strip=True) if about_element else "Not found"
+    
+    # Experience
+    experience_section = tree.css_first(_EXPERIENCE_SELECTOR)
+    experiences = []
+    if experience_section:
+        exp_items = find_items(experience_section, _EXP_ITEM_CLASSES)
+        for exp in exp_items[:5]:
+            try:
+                title_elem = exp.css_first(_TITLE_SELECTOR)
+                company_elem = exp.css_first(_SUBTITLE_SELECTOR)
+                duration_elem = exp.css_first(_EXP_DURATION_SELECTOR)
+                
+                experience = {
+                    'title': title_elem.text(strip=True) if title_elem else "Not specified",
+                    'company': company_elem.text(strip=True) if company_elem else "Not specified",
+                    'duration': duration_elem.text(strip=True) if duration_elem else "Not specified"
+                }
+                experiences.append(experience)
+            except:
+                continue
+    profile_data['experiences'] = experiences
+    
+    # Education
+    education_section = tree.css_first(_EDUCATION_SELECTOR)
+    educations = []
+    if education_section:
+        edu_items = find_items(education_section, _EDU_ITEM_CLASSES)
+        for edu in edu_items[:3]:
+            try:
+                school_elem = edu.css_first(_TITLE_SELECTOR)
+                degree_elem = edu.css_first(_SUBTITLE_SELECTOR)
+                duration_elem = edu.css_first(_EDU_DURATION_SELECTOR)
+                
+                education = {
+                    'school': school_elem.text(strip=True) if school_elem else "Not specified",
+                    'degree': degree_elem.text(strip=True) if degree_elem else "Not specified",
+                    'duration': duration_elem.text(strip=True) if duration_elem else "Not specified"
+                }
+                educations.append(education)
+            except:
+                continue
+    profile_data['educations'] = educations
+    
+    # Format the data
+    parts = ["LINKEDIN PROFILE ANALYSIS\n\n"]
+    parts.append(f"Profile URL: {profile_url}\n")
+    parts.append(f"Name: {profile_data['name']}\n")
+    parts.append(f"Headline: {profile_data['headline']}\n")
+    parts.append("="*60 + "\n\n")
+    
+    parts.append("ABOUT:\n")
+    parts.append(f"{profile_data['about']}\n\n")
+    
+    parts.append("EXPERIENCE:\n")
+    for i, exp in enumerate(profile_data['experiences'], 1):
+        parts.append(f"{i}. {exp['title']} at {exp['company']} ({exp['duration']})\n")
+    parts.append("\n")
+    
+    parts.append("EDUCATION:\n")
+    for i, edu in enumerate(profile_data['educations'], 1):
+        parts.append(f"{i}. {edu['degree']} at {edu['school']} ({edu['duration']})\n")
+    
+    return "".join(parts)
 
 def extract_linkedin_profile(profile_url):
     """Extract data from LinkedIn public profile"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        }
-        
-        response = requests.get(profile_url, headers=headers, timeout=15)
-        
-        if response.status_code != 200:
-            return f"Failed to access profile. Status: {response.status_code}"
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract profile information
-        profile_data = {}
-        
-        # Name
-        name_element = soup.find('h1', class_=['top-card-layout__title', 'text-heading-xlarge'])
-        if not name_element:
-            name_element = soup.find('h1')
-        profile_data['name'] = name_element.get_text(strip=True) if name_element else "Not found"
-        
-        # Headline
-        headline_element = soup.find('h2', class_=['top-card-layout__headline', 'text-body-medium'])
-        if not headline_element:
-            headline_element = soup.find('h2')
-        profile_data['headline'] = headline_element.get_text(strip=True) if headline_element else "Not found"
-        
-        # About section
-        about_element = soup.find('section', class_=['summary', 'about'])
-        if not about_element:
-            about_element = soup.find('div', class_=['core-section-container__content', 'break-words'])
-        profile_data['about'] = about_element.get_text(strip=True) if about_element else "Not found"
-        
-        # Experience
-        experience_section = soup.find('section', class_=['experience', 'experience-section'])
-        experiences = []
-        if experience_section:
-            exp_items = experience_section.find_all('li', class_=['experience-item', 'experience-list__item'])
-            for exp in exp_items[:5]:
-                try:
-                    title_elem = exp.find(['h3', 'h4'])
-                    company_elem = exp.find(['h4', 'h5'])
-                    duration_elem = exp.find('span', class_=['date-range', 'experience-item__duration'])
-                    
-                    experience = {
-                        'title': title_elem.get_text(strip=True) if title_elem else "Not specified",
-                        'company': company_elem.get_text(strip=True) if company_elem else "Not specified",
-                        'duration': duration_elem.get_text(strip=True) if duration_elem else "Not specified"
-                    }
-                    experiences.append(experience)
-                except:
-                    continue
-        profile_data['experiences'] = experiences
-        
-        # Education
-        education_section = soup.find('section', class_=['education', 'education-section'])
-        educations = []
-        if education_section:
-            edu_items = education_section.find_all('li', class_=['education__item', 'education-list__item'])
-            for edu in edu_items[:3]:
-                try:
-                    school_elem = edu.find(['h3', 'h4'])
-                    degree_elem = edu.find(['h4', 'h5'])
-                    duration_elem = edu.find('span', class_=['date-range', 'education__item--duration'])
-                    
-                    education = {
-                        'school': school_elem.get_text(strip=True) if school_elem else "Not specified",
-                        'degree': degree_elem.get_text(strip=True) if degree_elem else "Not specified",
-                        'duration': duration_elem.get_text(strip=True) if duration_elem else "Not specified"
-                    }
-                    educations.append(education)
-                except:
-                    continue
-        profile_data['educations'] = educations
-        
-        # Format the data
-        result = f"LINKEDIN PROFILE ANALYSIS\n\n"
-        result += f"Profile URL: {profile_url}\n"
-        result += f"Name: {profile_data['name']}\n"
-        result += f"Headline: {profile_data['headline']}\n"
-        result += "="*60 + "\n\n"
-        
-        result += "ABOUT:\n"
-        result += f"{profile_data['about']}\n\n"
-        
-        result += "EXPERIENCE:\n"
-        for i, exp in enumerate(profile_data['experiences'], 1):
-            result += f"{i}. {exp['title']} at {exp['company']} ({exp['duration']})\n"
-        result += "\n"
-        
-        result += "EDUCATION:\n"
-        for i, edu in enumerate(profile_data['educations'], 1):
-            result += f"{i}. {edu['degree']} at {edu['school']} ({edu['duration']})\n"
-        
-        return result
-        
+        return fetch_linkedin_profile(profile_url)
+    except requests.HTTPError as e:
+        return str(e)
     except Exception as e:
         return f"Error extracting profile: {str(e)}"
 
@@ -142,31 +191,104 @@ def get_linkedin_data(url, data_type):
     """Main function to extract LinkedIn data based on URL type"""
     return extract_linkedin_profile(url)
 
+def split_lines(text, chunk_size=1000, chunk_overlap=200):
+    """Greedily pack lines into chunks of at most chunk_size characters,
+    carrying up to chunk_overlap trailing characters into the next chunk"""
+    chunks = []
+    current = []
+    total = 0
+    for line in text.split("\n"):
+        if not line:
+            continue
+        if current and total + 1 + len(line) > chunk_size:
+            chunks.append("\n".join(current))
+            # Drop leading lines until the remainder fits the overlap and leaves room for this line
+            while current and (total > chunk_overlap or total + 1 + len(line) > chunk_size):
+                total -= len(current.pop(0)) + (1 if current else 0)
+        total += len(line) + (1 if current else 0)
+        current.append(line)
+    if current:
+        chunks.append("\n".join(current))
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+@st.cache_data
 def get_text_chunks(text):
     if not text.strip():
         return []
-    splitter = CharacterTextSplitter(separator="\n", chunk_size=1000, chunk_overlap=200)
-    return splitter.split_text(text)
+    return split_lines(text)
+
+@st.cache_resource
+def get_embedder():
+    """Load the sentence embedding model once per process, on GPU if available"""
+    import torch
+    from langchain.embeddings import SentenceTransformerEmbeddings
+    
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    return SentenceTransformerEmbeddings(
+        model_name='all-MiniLM-L6-v2',
+        model_kwargs={'device': device},
+        encode_kwargs={'batch_size': 64, 'normalize_embeddings': True}
+    )
+
+@st.cache_resource
+def get_llm(model_name):
+    """Create the Ollama client once per model"""
+    from langchain_community.llms.ollama import Ollama
+    
+    return Ollama(
+        model=model_name,
+        base_url="http://localhost:11434",
+        temperature=0.7,
+        top_p=0.9,
+        num_predict=500
+    )
 
+@st.cache_resource(max_entries=32)
 def get_vectorstore(text_chunks):
     if not text_chunks:
         return None
-    documents = [Document(page_content=chunk) for chunk in text_chunks]
-    vectorstore = FAISS.from_documents(documents, SentenceTransformerEmbeddings(model_name='all-MiniLM-L6-v2'))
+    import faiss
+    import numpy as np
+    from langchain.vectorstores import FAISS
+    from langchain.vectorstores.utils import DistanceStrategy
+    from langchain.docstore.in_memory import InMemoryDocstore
+    from langchain.schema import Document
+    
+    embedder = get_embedder()
+    # Encode longest chunks first so each batch pads to a similar length
+    order = sorted(range(len(text_chunks)), key=lambda i: len(text_chunks[i]), reverse=True)
+    sorted_vectors = embedder.embed_documents([text_chunks[i] for i in order])
+    vectors = np.empty((len(text_chunks), len(sorted_vectors[0])), dtype='float32')
+    vectors[order] = sorted_vectors
+    faiss.normalize_L2(vectors)
+
+    # Vectors are unit-norm, so inner product ranks the same as cosine similarity.
+    # Vectors are stored as 8-bit scalar codes, a quarter of the float32 size.
+    index = faiss.IndexHNSWSQ(vectors.shape[1], faiss.ScalarQuantizer.QT_8bit, 32, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = 40
+    index.train(vectors)
+    index.add(vectors)
+
+    ids = [str(i) for i in range(len(text_chunks))]
+    docstore = InMemoryDocstore({id_: Document(page_content=chunk) for id_, chunk in zip(ids, text_chunks)})
+    vectorstore = FAISS(
+        embedding_function=embedder,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=dict(enumerate(ids)),
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+    )
     return vectorstore
 
 def get_conversation_chain(vectorstore, model_name="llama2"):
     if vectorstore is None:
         return None
+    from langchain.memory import ConversationBufferMemory
+    from langchain.chains import ConversationalRetrievalChain
     
     try:
-        llm = Ollama(
-            model=model_name,
-            base_url="http://localhost:11434",
-            temperature=0.7,
-            top_p=0.9,
-            num_predict=500
-        )
+        # The LLM client and the index are cached; only the per-conversation memory is new
+        llm = get_llm(model_name)
         
         memory = ConversationBufferMemory(
             memory_key="chat_history", 
@@ -188,6 +310,32 @@ def get_conversation_chain(vectorstore, model_name="llama2"):
         st.error(f"Error initializing Ollama: {e}")
         return None
 
+def retrieve_docs_batch(vectorstore, questions, k=3):
+    """Retrieve the top k documents for several questions with one embedding batch and one index search"""
+    import faiss
+    import numpy as np
+    
+    vectors = np.asarray(get_embedder().embed_documents(questions), dtype='float32')
+    faiss.normalize_L2(vectors)
+    _, indices = vectorstore.index.search(vectors, k)
+    return {
+        question: [vectorstore.docstore.search(vectorstore.index_to_docstore_id[j]) for j in row if j != -1]
+        for question, row in zip(questions, indices)
+    }
+
+def answer_from_docs(conversation, question, docs):
+    """Answer a standalone question from already retrieved documents.
+    Skips the chain's question rewrite and retrieval but keeps its memory up to date"""
+    answer = conversation.combine_docs_chain.invoke({"input_documents": docs, "question": question})["output_text"]
+    conversation.memory.save_context({"question": question}, {"answer": answer})
+    return answer
+
+def ask_quick_question(question):
+    """Queue a quick question, retrieving context for all quick questions on first use"""
+    if st.session_state.quick_docs is None:
+        st.session_state.quick_docs = retrieve_docs_batch(st.session_state.vectorstore, list(QUICK_QUESTIONS.values()))
+    st.session_state.chat_history.append({"question": question, "answer": ""})
+
 def display_chat_message(role, content, avatar):
     """Display a chat message with beautiful formatting"""
     with st.chat_message(role, avatar=avatar):
@@ -256,6 +404,8 @@ def main():
         st.session_state.chat_history = []
     if "processed" not in st.session_state:
         st.session_state.processed = False
+    if "quick_docs" not in st.session_state:
+        st.session_state.quick_docs = None
 
     with st.sidebar:
         st.header("⚙️ Configuration")
@@ -287,11 +437,18 @@ def main():
                         if chunks:
                             vectorstore = get_vectorstore(chunks)
                             st.session_state.vectorstore = vectorstore
+                            st.session_state.quick_docs = None
                             st.session_state.conversation = get_conversation_chain(vectorstore, model_name)
                             
                             if st.session_state.conversation:
                                 st.session_state.processed = True
                                 st.session_state.extracted_data = extracted_data
+                                st.session_state.metrics = {
+                                    'chars': len(extracted_data),
+                                    'words': len(extracted_data.split()),
+                                    'lines': extracted_data.count('\n') + 1,
+                                    'chunks': len(chunks)
+                                }
                                 st.success(f"✅ Success! Extracted {len(chunks)} data chunks.")
                             else:
                                 st.error("❌ Failed to initialize AI model.")
@@ -306,54 +463,42 @@ def main():
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("📊 Summary", use_container_width=True):
-                    st.session_state.chat_history.append({
-                        "question": "Can you provide a comprehensive summary of this profile?",
-                        "answer": ""
-                    })
+                    ask_quick_question(QUICK_QUESTIONS["summary"])
             with col2:
                 if st.button("💼 Experience", use_container_width=True):
-                    st.session_state.chat_history.append({
-                        "question": "What is their professional experience background?",
-                        "answer": ""
-                    })
+                    ask_quick_question(QUICK_QUESTIONS["experience"])
             
             col3, col4 = st.columns(2)
             with col3:
                 if st.button("🎓 Education", use_container_width=True):
-                    st.session_state.chat_history.append({
-                        "question": "Tell me about their educational background",
-                        "answer": ""
-                    })
+                    ask_quick_question(QUICK_QUESTIONS["education"])
             with col4:
                 if st.button("🌟 Skills", use_container_width=True):
-                    st.session_state.chat_history.append({
-                        "question": "What skills and expertise does this person have?",
-                        "answer": ""
-                    })
+                    ask_quick_question(QUICK_QUESTIONS["skills"])
 
     # Main content area
     if st.session_state.processed:
         # Data overview cards
         st.header("📈 Data Overview")
         data = st.session_state.extracted_data
-        chunks = get_text_chunks(data)
+        metrics = st.session_state.metrics
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Data Length", f"{len(data):,} chars")
+            st.metric("Data Length", f"{metrics['chars']:,} chars")
             st.markdown('</div>', unsafe_allow_html=True)
         with col2:
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Text Chunks", len(chunks))
+            st.metric("Text Chunks", metrics['chunks'])
             st.markdown('</div>', unsafe_allow_html=True)
         with col3:
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Words", f"{len(data.split()):,}")
+            st.metric("Words", f"{metrics['words']:,}")
             st.markdown('</div>', unsafe_allow_html=True)
         with col4:
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Lines", data.count('\n') + 1)
+            st.metric("Lines", metrics['lines'])
             st.markdown('</div>', unsafe_allow_html=True)
 
         # Chat interface
@@ -371,8 +516,12 @@ def main():
                     with st.chat_message("assistant", avatar="🤖"):
                         with st.spinner("Analyzing..."):
                             try:
-                                response = st.session_state.conversation.invoke({"question": chat["question"]})
-                                answer = response.get("answer", "I couldn't generate a response for this question.")
+                                quick_docs = st.session_state.quick_docs or {}
+                                if chat["question"] in quick_docs:
+                                    answer = answer_from_docs(st.session_state.conversation, chat["question"], quick_docs[chat["question"]])
+                                else:
+                                    response = st.session_state.conversation.invoke({"question": chat["question"]})
+                                    answer = response.get("answer", "I couldn't generate a response for this question.")
                                 st.session_state.chat_history[i]["answer"] = answer
                                 st.markdown(answer)
                             except Exception as e: